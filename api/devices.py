@@ -1,8 +1,10 @@
-from fastapi import APIRouter, Depends, HTTPException, status, UploadFile, File, Form, Query
-from fastapi.responses import StreamingResponse
+from fastapi import APIRouter, Depends, HTTPException, Request, status, UploadFile, File, Form, Query, Response
+import asyncio
+import hashlib
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import ORJSONResponse
 from sqlalchemy.orm import Session
-from typing import Optional, List
-import io
+from typing import Dict, Optional, List
 import math
 
 from db.database import get_db
@@ -12,9 +14,16 @@ from schemas.device import (
 )
 from api.auth import get_current_user, get_current_admin_user
 from models.user import User
+from utils.qr_utils import generate_qr_code_svg
 
 router = APIRouter()
 
+# In-flight QR generations keyed by device id (single-flight). When many
+# requests race on a device whose QR hasn't been generated yet, only the
+# first one does the work; the rest await its Future. Once the bytes are
+# stored, requests read them directly and never enter this path.
+_qr_inflight: Dict[int, asyncio.Future] = {}
+
 
 # Public endpoints
 @router.get("/", response_model=DeviceListResponse, summary="Get all devices")
@@ -32,20 +41,22 @@ async def get_devices(
     devices = device_crud.get_all(skip=skip, limit=per_page, active_only=active_only)
     total = device_crud.get_total_count(active_only=active_only)
     total_pages = math.ceil(total / per_page)
-    
-    # Convert to response format
-    device_responses = []
-    for device in devices:
-        device_dict = device_crud.convert_device_to_dict(device, include_image_data=include_images)
-        device_responses.append(DeviceResponse(**device_dict))
-    
-    return DeviceListResponse(
-        devices=device_responses,
-        total=total,
-        page=page,
-        per_page=per_page,
-        total_pages=total_pages
-    )
+
+    # The dicts already match DeviceResponse, so skip per-item pydantic
+    # validation and serialize directly with orjson (response_model stays
+    # for the OpenAPI docs; returning a Response bypasses re-validation)
+    device_dicts = [
+        device_crud.convert_device_to_dict(device, include_image_data=include_images)
+        for device in devices
+    ]
+
+    return ORJSONResponse({
+        "devices": device_dicts,
+        "total": total,
+        "page": page,
+        "per_page": per_page,
+        "total_pages": total_pages
+    })
 
 
 @router.get("/{device_id}", response_model=DeviceResponse, summary="Get device by ID")
@@ -65,7 +76,7 @@ async def get_device(
         )
     
     device_dict = device_crud.convert_device_to_dict(device, include_image_data=include_images)
-    return DeviceResponse(**device_dict)
+    return DeviceResponse.model_construct(**device_dict)
 
 
 @router.get("/{device_id}/image", summary="Get device image")
@@ -81,17 +92,51 @@ async def get_device_image(device_id: int, db: Session = Depends(get_db)):
         )
     
     image_bytes, content_type = image_data
-    return StreamingResponse(
-        io.BytesIO(image_bytes),
+    # The bytes are already fully in memory - hand them to the response
+    # directly instead of wrapping in a BytesIO and streaming chunk by chunk
+    return Response(
+        content=image_bytes,
         media_type=content_type,
         headers={"Content-Disposition": f"inline; filename=device_{device_id}_image.jpg"}
     )
 
 
 @router.get("/{device_id}/qr-code", summary="Get device QR code")
-async def get_device_qr_code(device_id: int, db: Session = Depends(get_db)):
+async def get_device_qr_code(
+    device_id: int,
+    request: Request,
+    svg: bool = Query(False, description="Return the QR code as SVG instead of PNG"),
+    db: Session = Depends(get_db)
+):
     """Get device QR code image"""
     device_crud = DeviceCRUD(db)
+
+    if svg:
+        # SVG is rendered on the fly from the persisted qr_data payload
+        # (the stored bytes stay PNG): reusing the stored string keeps the
+        # SVG encoding the same data the PNG does and gives the in-process
+        # SVG cache a stable key to hit on
+        device = device_crud.get_by_id(device_id)
+        if not device:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail="Device not found"
+            )
+        if not device.qr_data:
+            # Rows from before qr_data was persisted - generate and store it
+            device = device_crud.generate_qr_code(device)
+            if not device.qr_data:
+                raise HTTPException(
+                    status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+                    detail="Failed to generate QR code"
+                )
+        svg_bytes, content_type = generate_qr_code_svg(device.qr_data)
+        return Response(
+            content=svg_bytes,
+            media_type=content_type,
+            headers={"Content-Disposition": f"inline; filename=device_{device_id}_qr.svg"}
+        )
+
     qr_data = device_crud.get_qr_code(device_id)
     
     if not qr_data:
@@ -103,7 +148,26 @@ async def get_device_qr_code(device_id: int, db: Session = Depends(get_db)):
                 detail="Device not found"
             )
         
-        device_crud.generate_qr_code(device)
+        future = _qr_inflight.get(device_id)
+        if future is None:
+            future = asyncio.get_running_loop().create_future()
+            _qr_inflight[device_id] = future
+            try:
+                await run_in_threadpool(device_crud.generate_qr_code, device)
+            finally:
+                # Resolve unconditionally (even on cancellation) so waiters
+                # never hang on an abandoned future; they re-read below and
+                # 500 on their own if the bytes still aren't there
+                _qr_inflight.pop(device_id, None)
+                if not future.done():
+                    future.set_result(None)
+        else:
+            # Another request is already generating this device's QR - wait
+            # for it, then expire our session's copy of the device: a plain
+            # re-select won't overwrite attributes already in the identity
+            # map, so without this we'd still see qr_code_data as None
+            await future
+            db.expire(device)
         qr_data = device_crud.get_qr_code(device_id)
         
         if not qr_data:
@@ -113,10 +177,23 @@ async def get_device_qr_code(device_id: int, db: Session = Depends(get_db)):
             )
     
     qr_bytes, content_type = qr_data
-    return StreamingResponse(
-        io.BytesIO(qr_bytes),
+    # QR bytes only change when device_name/version change, so let browsers
+    # revalidate with an ETag and skip the payload entirely on a match
+    etag = f'"{hashlib.sha1(qr_bytes).hexdigest()}"'
+    if request.headers.get("if-none-match") == etag:
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers={"ETag": etag})
+
+    # Hand the immutable bytes straight to the response - no BytesIO copy.
+    # (memoryview was considered but starlette's Response.render only
+    # accepts bytes, so wrapping would just force a copy back.)
+    return Response(
+        content=qr_bytes,
         media_type=content_type,
-        headers={"Content-Disposition": f"inline; filename=device_{device_id}_qr.png"}
+        headers={
+            "Content-Disposition": f"inline; filename=device_{device_id}_qr.png",
+            "ETag": etag,
+            "Cache-Control": "public, max-age=3600"
+        }
     )
 
 
@@ -140,7 +217,7 @@ async def create_device(
     
     device = device_crud.create(device_data)
     device_dict = device_crud.convert_device_to_dict(device, include_image_data=True)
-    return DeviceResponse(**device_dict)
+    return DeviceResponse.model_construct(**device_dict)
 
 
 @router.post("/with-image", response_model=DeviceResponse, summary="Create device with image (Admin only)")
@@ -172,7 +249,7 @@ async def create_device_with_image(
     
     device = await device_crud.create_with_image(device_data, image)
     device_dict = device_crud.convert_device_to_dict(device, include_image_data=True)
-    return DeviceResponse(**device_dict)
+    return DeviceResponse.model_construct(**device_dict)
 
 
 @router.put("/{device_id}", response_model=DeviceResponse, summary="Update device (Admin only)")
@@ -202,7 +279,7 @@ async def update_device(
         )
     
     device_dict = device_crud.convert_device_to_dict(device, include_image_data=True)
-    return DeviceResponse(**device_dict)
+    return DeviceResponse.model_construct(**device_dict)
 
 
 @router.put("/{device_id}/image", response_model=DeviceResponse, summary="Update device image (Admin only)")
@@ -223,7 +300,7 @@ async def update_device_image(
         )
     
     device_dict = device_crud.convert_device_to_dict(device, include_image_data=True)
-    return DeviceResponse(**device_dict)
+    return DeviceResponse.model_construct(**device_dict)
 
 
 @router.delete("/{device_id}/image", response_model=DeviceResponse, summary="Remove device image (Admin only)")
@@ -243,7 +320,7 @@ async def remove_device_image(
         )
     
     device_dict = device_crud.convert_device_to_dict(device, include_image_data=True)
-    return DeviceResponse(**device_dict)
+    return DeviceResponse.model_construct(**device_dict)
 
 
 @router.post("/{device_id}/regenerate-qr", response_model=DeviceResponse, summary="Regenerate QR code (Admin only)")
@@ -263,7 +340,7 @@ async def regenerate_qr_code(
         )
     
     device_dict = device_crud.convert_device_to_dict(device, include_image_data=True)
-    return DeviceResponse(**device_dict)
+    return DeviceResponse.model_construct(**device_dict)
 
 
 @router.post("/{device_id}/activate", response_model=DeviceResponse, summary="Activate device (Admin only)")
@@ -283,7 +360,7 @@ async def activate_device(
         )
     
     device_dict = device_crud.convert_device_to_dict(device, include_image_data=True)
-    return DeviceResponse(**device_dict)
+    return DeviceResponse.model_construct(**device_dict)
 
 
 @router.delete("/{device_id}", summary="Deactivate device (Admin only)")
@@ -341,4 +418,4 @@ async def get_device_by_name(
         )
     
     device_dict = device_crud.convert_device_to_dict(device, include_image_data=include_images)
-    return DeviceResponse(**device_dict)
+    return DeviceResponse.model_construct(**device_dict)
@@ -1,16 +1,41 @@
 from fastapi import APIRouter, Depends, HTTPException, status, UploadFile, File, Form
-from fastapi.responses import Response
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import Response, FileResponse, ORJSONResponse
 from sqlalchemy.orm import Session
 from typing import List, Optional
 
+from config import settings
 from db.database import get_db
 from crud.post import PostCRUD
-from models.post import Post
+from models.post import Post, SectionType
 from schemas.post import PostCreate, PostUpdate, PostResponse, FeedbackCreate, PostWithUserFeedback, FeedbackTypeEnum, TextSectionCreate, VideoSectionCreate, SectionTypeEnum
 from api.auth import get_current_active_user, get_current_admin_user
+from utils.media_store import ensure_on_disk, media_root, blob_path
 
 router = APIRouter(prefix="/posts", tags=["posts"])
 
+def serve_media_file(file_path, content_type: str, filename: str):
+    """
+    Serve an image file with FileResponse so the kernel can use sendfile.
+    When NGINX_ACCEL_REDIRECT is configured, nginx serves the file directly.
+    """
+    headers = {
+        "Content-Disposition": f"inline; filename={filename or file_path.name}",
+        "Cache-Control": "public, max-age=3600"  # Cache for 1 hour
+    }
+
+    if settings.NGINX_ACCEL_REDIRECT:
+        relative_path = file_path.relative_to(media_root()).as_posix()
+        headers["X-Accel-Redirect"] = f"{settings.NGINX_ACCEL_REDIRECT}/{relative_path}"
+        return Response(media_type=content_type, headers=headers)
+
+    return FileResponse(file_path, media_type=content_type, headers=headers)
+
+def serve_image_from_disk(kind: str, entity_id: int, image_bytes: bytes, content_type: str, filename: str):
+    """Serve inline/legacy image bytes through the filesystem cache"""
+    file_path = ensure_on_disk(kind, entity_id, filename or "image.jpg", image_bytes)
+    return serve_media_file(file_path, content_type, file_path.name)
+
 # Public endpoints (read-only)
 @router.get("/")
 def get_posts(
@@ -28,13 +53,14 @@ def get_posts(
         posts_data = []
         for post in posts:
             posts_data.append(post_crud.convert_post_to_dict(post, include_image_data=include_images))
-        
-        return {
+
+        # Return the response directly to skip the jsonable_encoder pass
+        return ORJSONResponse({
             "posts": posts_data,
             "count": len(posts_data),
             "skip": skip,
             "limit": limit
-        }
+        })
         
     except Exception as e:
         return {
@@ -68,12 +94,13 @@ def get_posts_with_user_feedback(
             if post.get("updated_at"):
                 post["updated_at"] = post["updated_at"].isoformat()
         
-        return {
+        # Return the response directly to skip the jsonable_encoder pass
+        return ORJSONResponse({
             "posts": posts_with_feedback,
             "count": len(posts_with_feedback),
             "skip": skip,
             "limit": limit
-        }
+        })
         
     except Exception as e:
         return {
@@ -116,25 +143,26 @@ def get_post_image(
     """Get main post image as binary response"""
     try:
         post_crud = PostCRUD(db)
+
+        # Out-of-row images already live on disk - serve the file directly
+        post = post_crud.get_by_id(post_id)
+        if post and post.blob_storage_key:
+            file_path = blob_path(post.blob_storage_key)
+            if file_path.exists():
+                return serve_media_file(file_path, post.image_content_type, post.image_filename)
+
         image_data = post_crud.get_post_image(post_id)
-        
+
         if not image_data:
             raise HTTPException(
                 status_code=status.HTTP_404_NOT_FOUND,
                 detail="Post image not found"
             )
-        
+
         image_bytes, content_type, filename = image_data
-        
-        return Response(
-            content=image_bytes,
-            media_type=content_type,
-            headers={
-                "Content-Disposition": f"inline; filename={filename}",
-                "Cache-Control": "public, max-age=3600"  # Cache for 1 hour
-            }
-        )
-        
+
+        return serve_image_from_disk("posts", post_id, image_bytes, content_type, filename)
+
     except HTTPException:
         raise
     except Exception as e:
@@ -283,6 +311,14 @@ def get_section_image(
     """Get section image as binary response"""
     try:
         post_crud = PostCRUD(db)
+
+        # Out-of-row images already live on disk - serve the file directly
+        section = post_crud.get_section_by_id(section_id)
+        if section and section.blob_storage_key:
+            file_path = blob_path(section.blob_storage_key)
+            if file_path.exists():
+                return serve_media_file(file_path, section.image_content_type, section.image_filename)
+
         image_data = post_crud.get_section_image(section_id)
         
         if not image_data:
@@ -292,16 +328,9 @@ def get_section_image(
             )
         
         image_bytes, content_type, filename = image_data
-        
-        return Response(
-            content=image_bytes,
-            media_type=content_type,
-            headers={
-                "Content-Disposition": f"inline; filename={filename}",
-                "Cache-Control": "public, max-age=3600"
-            }
-        )
-        
+
+        return serve_image_from_disk("sections", section_id, image_bytes, content_type, filename)
+
     except HTTPException:
         raise
     except Exception as e:
@@ -365,9 +394,9 @@ async def add_image_section(
     """Admin only: Add an image section to a post"""
     try:
         post_crud = PostCRUD(db)
-        
-        # Check if post exists
-        post = post_crud.get_by_id(post_id)
+
+        # Check if post exists (offload sync DB call so the loop isn't blocked)
+        post = await run_in_threadpool(post_crud.get_by_id, post_id)
         if not post:
             return {
                 "error": "Post not found",
@@ -546,81 +575,75 @@ async def create_complete_post(
         # Create the basic post with main image
         post_data = PostCreate(header=header, description=description)
         db_post = await post_crud.create_with_image(post_data, main_image)
-        
-        created_sections = []
-        
-        # Process each section based on its type
+
+        # Build all section rows first so they can go in with one INSERT
+        section_rows = []
+
         for section_info in sections_data:
             section_type = section_info.get("type")
             order_index = section_info.get("order_index", 0)
             content = section_info.get("content", "")
-            
+
             if section_type == "text":
-                # Create text section
                 section_data = TextSectionCreate(
                     order_index=order_index,
                     text_content=content
                 )
-                section = post_crud.create_text_section(db_post.id, section_data)
-                if section:
-                    created_sections.append({
-                        "id": section.id,
-                        "type": "text",
-                        "order_index": section.order_index,
-                        "content": section.text_content[:100] + "..." if len(section.text_content) > 100 else section.text_content
-                    })
-            
+                section_rows.append(post_crud.build_text_section_row(section_data))
+
             elif section_type == "image":
-                # Create image section - find image by filename in content
+                # Find the uploaded image that matches the content filename
                 image_filename = content
-                if images:
-                    # Find the uploaded image that matches the content filename
-                    matching_image = None
-                    for image_file in images:
-                        if image_file.filename == image_filename:
-                            matching_image = image_file
-                            break
-                    
-                    if matching_image:
-                        section = await post_crud.create_image_section(db_post.id, order_index, matching_image)
-                        if section:
-                            created_sections.append({
-                                "id": section.id,
-                                "type": "image",
-                                "order_index": section.order_index,
-                                "filename": section.image_filename,
-                                "image_url": f"/api/v1/posts/sections/{section.id}/image"
-                            })
-                    else:
-                        return {"error": f"Image file '{image_filename}' not found in uploaded images"}
-                else:
+                if not images:
                     return {"error": f"No images uploaded but image section requires '{image_filename}'"}
-            
+
+                matching_image = None
+                for image_file in images:
+                    if image_file.filename == image_filename:
+                        matching_image = image_file
+                        break
+
+                if not matching_image:
+                    return {"error": f"Image file '{image_filename}' not found in uploaded images"}
+
+                section_rows.append(await post_crud.build_image_section_row(order_index, matching_image))
+
             elif section_type == "video":
-                # Create video section
                 section_data = VideoSectionCreate(
                     order_index=order_index,
                     video_url=content
                 )
-                section = post_crud.create_video_section(db_post.id, section_data)
-                if section:
-                    created_sections.append({
-                        "id": section.id,
-                        "type": "video",
-                        "order_index": section.order_index,
-                        "video_url": section.video_url
-                    })
-            
+                section_rows.append(post_crud.build_video_section_row(section_data))
+
             else:
                 return {"error": f"Invalid section type: {section_type}. Must be 'text', 'image', or 'video'"}
-        
+
+        # Insert every section in a single round trip
+        sections_created = await run_in_threadpool(post_crud.create_sections_bulk, db_post.id, section_rows)
+
         # Get the complete post with all sections
-        complete_post = post_crud.get_by_id(db_post.id)
-        
+        complete_post = await run_in_threadpool(post_crud.get_by_id, db_post.id)
+
+        created_sections = []
+        for section in complete_post.sections:
+            entry = {
+                "id": section.id,
+                "type": section.section_type.value,
+                "order_index": section.order_index
+            }
+            if section.section_type == SectionType.text:
+                entry["content"] = section.text_content[:100] + "..." if len(section.text_content) > 100 else section.text_content
+            elif section.section_type == SectionType.image:
+                entry["filename"] = section.image_filename
+                entry["image_url"] = f"/api/v1/posts/sections/{section.id}/image"
+            elif section.section_type == SectionType.video:
+                entry["video_url"] = section.video_url
+            created_sections.append(entry)
+
         return {
             "message": "Complete post created successfully",
             "post": post_crud.convert_post_to_dict(complete_post, include_image_data=False),
-            "sections_created": len(created_sections),
+            "sections_created": sections_created,
             "created_sections": created_sections
         }
         
@@ -645,8 +668,6 @@ def create_post(
         db_post = Post(
             header=post_data.header,
             description=post_data.description,
-            positive_feedbacks=0,
-            negative_feedbacks=0,
             is_active=True
         )
         
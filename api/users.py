@@ -1,4 +1,5 @@
 from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi.responses import ORJSONResponse
 from sqlalchemy.orm import Session
 from typing import List
 
@@ -218,13 +219,14 @@ def get_users(
                 "updated_at": user.updated_at.isoformat() if user.updated_at else None
             })
         
-        return {
+        # Return the response directly to skip the jsonable_encoder pass
+        return ORJSONResponse({
             "users": users_data,
             "count": len(users_data),
             "skip": skip,
             "limit": limit,
             "active_only": active_only
-        }
+        })
         
     except Exception as e:
         return {
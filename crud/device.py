@@ -2,11 +2,14 @@ from sqlalchemy.orm import Session
 from sqlalchemy import desc
 from models.device import Device
 from schemas.device import DeviceCreate, DeviceUpdate
-from utils.image_utils import process_uploaded_image
+from utils.image_utils import process_uploaded_image, image_to_base64_cached
+from utils.log_utils import get_logger
 from utils.qr_utils import create_device_qr_code
 from fastapi import UploadFile
 from typing import Optional, List, Tuple
 
+logger = get_logger(__name__)
+
 
 class DeviceCRUD:
     def __init__(self, db: Session):
@@ -46,7 +49,7 @@ class DeviceCRUD:
                 db_device.image_filename = filename
                 db_device.image_content_type = content_type
             except Exception as e:
-                print(f"Error processing device image: {e}")
+                logger.exception("Error processing device image")
         
         self.db.add(db_device)
         self.db.commit()
@@ -115,7 +118,7 @@ class DeviceCRUD:
             self.db.refresh(db_device)
             return db_device
         except Exception as e:
-            print(f"Error updating device image: {e}")
+            logger.exception("Error updating device image")
             return None
 
     def remove_device_image(self, device_id: int) -> Optional[Device]:
@@ -177,10 +180,11 @@ class DeviceCRUD:
                 device.id, device.device_name, device.version
             )
             device.qr_code_data = qr_image_bytes
+            device.qr_data = qr_data
             self.db.commit()
             self.db.refresh(device)
         except Exception as e:
-            print(f"Error generating QR code: {e}")
+            logger.exception("Error generating QR code")
         
         return device
 
@@ -201,8 +205,6 @@ class DeviceCRUD:
 
     def convert_device_to_dict(self, device: Device, include_image_data: bool = True) -> dict:
         """Convert device model to dictionary for API response"""
-        import base64
-        
         device_dict = {
             "id": device.id,
             "device_name": device.device_name,
@@ -216,26 +218,34 @@ class DeviceCRUD:
             "updated_at": device.updated_at
         }
         
-        # Include base64 encoded image data if requested and available
+        # Include base64 encoded image data if requested and available.
+        # Encodes are memoized by (id, updated_at) so unchanged blobs are
+        # converted once, not on every response.
         if include_image_data and device.image_data:
             try:
-                image_b64 = base64.b64encode(device.image_data).decode('utf-8')
-                device_dict["image_data"] = f"data:{device.image_content_type or 'image/jpeg'};base64,{image_b64}"
+                device_dict["image_data"] = image_to_base64_cached(
+                    ("device_image", device.id, device.updated_at),
+                    device.image_data,
+                    device.image_content_type or "image/jpeg"
+                )
             except Exception as e:
-                print(f"Error encoding image data: {e}")
+                logger.exception("Error encoding image data")
                 device_dict["image_data"] = None
         else:
             device_dict["image_data"] = None
-        
+
         # Include base64 encoded QR code data if available
         if device.qr_code_data:
             try:
-                qr_b64 = base64.b64encode(device.qr_code_data).decode('utf-8')
-                device_dict["qr_code_data"] = f"data:image/png;base64,{qr_b64}"
+                device_dict["qr_code_data"] = image_to_base64_cached(
+                    ("device_qr", device.id, device.updated_at),
+                    device.qr_code_data,
+                    "image/png"
+                )
             except Exception as e:
-                print(f"Error encoding QR code data: {e}")
+                logger.exception("Error encoding QR code data")
                 device_dict["qr_code_data"] = None
         else:
             device_dict["qr_code_data"] = None
-        
+
         return device_dict
@@ -1,29 +1,84 @@
+
 from sqlalchemy.orm import Session
-from sqlalchemy import and_
+from sqlalchemy import and_, func, insert, select
+from sqlalchemy.dialects.mysql import insert as mysql_insert
 from typing import List, Optional, Tuple
 from fastapi import UploadFile
-from models.post import Post, PostSection, PostFeedback, FeedbackType, SectionType
+from fastapi.concurrency import run_in_threadpool
+from models.post import Post, PostSection, PostFeedback, PostFeedbackCounter, FeedbackType, SectionType
 from schemas.post import PostCreate, PostUpdate, FeedbackCreate, TextSectionCreate, VideoSectionCreate, SectionTypeEnum
-from utils.image_utils import process_uploaded_image, image_to_base64, get_image_info
+from utils.cache import TTLCache
+from utils.image_utils import process_uploaded_image, image_to_base64_cached, get_image_info, INLINE_THRESHOLD
+from utils.log_utils import get_logger
+from utils.media_store import store_blob, load_blob, blob_path
+
+logger = get_logger(__name__)
+
+# In-process caches for the hottest lookups. ORM rows can't be shared across
+# sessions, so these hold the immutable image payload tuples instead.
+_post_image_cache = TTLCache(maxsize=128, ttl=300)
+_section_image_cache = TTLCache(maxsize=256, ttl=300)
 
 class PostCRUD:
     def __init__(self, db: Session):
         self.db = db
 
+    def _persist(self, obj):
+        """Add, commit and refresh an object (sync - run in threadpool from async code)"""
+        self.db.add(obj)
+        self.db.commit()
+        self.db.refresh(obj)
+        return obj
+
+    @staticmethod
+    def _image_row_values(image_data: bytes, filename: str, content_type: str) -> dict:
+        """Build the image column values for a Post/PostSection row.
+
+        Small images stay inline; larger ones go out-of-row to the media
+        store so list queries never drag multi-MB blobs through the socket.
+        """
+        info = get_image_info(image_data)
+        values = {
+            "image_size": len(image_data),
+            "image_width": info["width"],
+            "image_height": info["height"],
+            "image_filename": filename,
+            "image_content_type": content_type
+        }
+        if len(image_data) <= INLINE_THRESHOLD:
+            values["image_data"] = image_data
+            values["blob_storage_key"] = None
+        else:
+            values["image_data"] = None
+            values["blob_storage_key"] = store_blob(image_data, filename)
+        return values
+
+    @staticmethod
+    def _store_image(target, image_data: bytes, filename: str, content_type: str) -> None:
+        """Attach processed image bytes to a Post/PostSection row"""
+        for field, value in PostCRUD._image_row_values(image_data, filename, content_type).items():
+            setattr(target, field, value)
+
+    @staticmethod
+    def _image_bytes(row):
+        """Get image bytes for a row, loading out-of-row blobs as needed"""
+        if row.blob_storage_key:
+            return load_blob(row.blob_storage_key)
+        return row.image_data
+
     def create(self, post_data: PostCreate) -> Post:
         """Create a new post"""
         # Create post data
         db_post = Post(
             header=post_data.header,
             description=post_data.description,
-            positive_feedbacks=0,
-            negative_feedbacks=0,
             is_active=True
         )
         
         self.db.add(db_post)
         self.db.commit()
-        self.db.refresh(db_post)
+        # No refresh: id is known from the insert and created_at has a
+        # client-side default, so nothing server-generated is missing
         return db_post
 
     async def create_with_image(self, post_data: PostCreate, image_file: Optional[UploadFile] = None) -> Post:
@@ -32,8 +87,6 @@ class PostCRUD:
         db_post = Post(
             header=post_data.header,
             description=post_data.description,
-            positive_feedbacks=0,
-            negative_feedbacks=0,
             is_active=True
         )
         
@@ -41,34 +94,29 @@ class PostCRUD:
         if image_file:
             try:
                 image_data, filename, content_type = await process_uploaded_image(image_file)
-                db_post.image_data = image_data
-                db_post.image_filename = filename
-                db_post.image_content_type = content_type
+                self._store_image(db_post, image_data, filename, content_type)
             except Exception as e:
-                print(f"Error processing main post image: {e}")
-        
-        self.db.add(db_post)
-        self.db.commit()
-        self.db.refresh(db_post)
+                logger.exception("Error processing main post image")
+
+        # Offload the blocking commit/refresh so the event loop stays free
+        await run_in_threadpool(self._persist, db_post)
         return db_post
 
     async def update_post_image(self, post_id: int, image_file: UploadFile) -> Optional[Post]:
         """Update main post image"""
-        db_post = self.get_by_id(post_id)
+        db_post = await run_in_threadpool(self.get_by_id, post_id)
         if not db_post:
             return None
 
         try:
             image_data, filename, content_type = await process_uploaded_image(image_file)
-            db_post.image_data = image_data
-            db_post.image_filename = filename
-            db_post.image_content_type = content_type
-            
-            self.db.commit()
-            self.db.refresh(db_post)
+            self._store_image(db_post, image_data, filename, content_type)
+
+            await run_in_threadpool(self._persist, db_post)
+            _post_image_cache.invalidate(post_id)
             return db_post
         except Exception as e:
-            print(f"Error updating main post image: {e}")
+            logger.exception("Error updating main post image")
             return None
 
     def remove_post_image(self, post_id: int) -> Optional[Post]:
@@ -78,24 +126,38 @@ class PostCRUD:
             return None
 
         db_post.image_data = None
+        db_post.blob_storage_key = None
+        db_post.image_size = None
         db_post.image_filename = None
         db_post.image_content_type = None
-        
+
         self.db.commit()
         self.db.refresh(db_post)
+        _post_image_cache.invalidate(post_id)
         return db_post
 
     def get_post_image(self, post_id: int) -> Optional[Tuple[bytes, str, str]]:
         """Get main post image data, content type, and filename"""
+        cached = _post_image_cache.get(post_id)
+        if cached is not None:
+            return cached
+
         db_post = self.get_by_id(post_id)
-        if not db_post or not db_post.image_data:
+        if not db_post:
+            return None
+
+        image_bytes = self._image_bytes(db_post)
+        if not image_bytes:
             return None
-        
-        return db_post.image_data, db_post.image_content_type, db_post.image_filename
+
+        image = (image_bytes, db_post.image_content_type, db_post.image_filename)
+        _post_image_cache.set(post_id, image)
+        return image
 
     def get_by_id(self, post_id: int) -> Optional[Post]:
         """Get post by ID"""
-        return self.db.query(Post).filter(Post.id == post_id).first()
+        stmt = select(Post).where(Post.id == post_id)
+        return self.db.execute(stmt).scalar_one_or_none()
 
     def get_all(self, skip: int = 0, limit: int = 100, active_only: bool = True) -> List[Post]:
         """Get all posts with pagination"""
@@ -106,7 +168,8 @@ class PostCRUD:
 
     def get_active_posts(self, skip: int = 0, limit: int = 100) -> List[Post]:
         """Get only active posts"""
-        return self.db.query(Post).filter(Post.is_active == True).offset(skip).limit(limit).all()
+        stmt = select(Post).where(Post.is_active == True).offset(skip).limit(limit)
+        return self.db.execute(stmt).scalars().all()
 
     def update(self, post_id: int, post_data: PostUpdate) -> Optional[Post]:
         """Update a post (text fields only)"""
@@ -124,21 +187,19 @@ class PostCRUD:
 
     async def update_image(self, post_id: int, image_file: UploadFile) -> Optional[Post]:
         """Update post image"""
-        db_post = self.get_by_id(post_id)
+        db_post = await run_in_threadpool(self.get_by_id, post_id)
         if not db_post:
             return None
 
         try:
             image_data, filename, content_type = await process_uploaded_image(image_file)
-            db_post.image_data = image_data
-            db_post.image_filename = filename
-            db_post.image_content_type = content_type
-            
-            self.db.commit()
-            self.db.refresh(db_post)
+            self._store_image(db_post, image_data, filename, content_type)
+
+            await run_in_threadpool(self._persist, db_post)
+            _post_image_cache.invalidate(post_id)
             return db_post
         except Exception as e:
-            print(f"Error updating image: {e}")
+            logger.exception("Error updating image")
             return None
 
     def remove_image(self, post_id: int) -> Optional[Post]:
@@ -148,11 +209,14 @@ class PostCRUD:
             return None
 
         db_post.image_data = None
+        db_post.blob_storage_key = None
+        db_post.image_size = None
         db_post.image_filename = None
         db_post.image_content_type = None
-        
+
         self.db.commit()
         self.db.refresh(db_post)
+        _post_image_cache.invalidate(post_id)
         return db_post
 
     def delete(self, post_id: int) -> bool:
@@ -163,15 +227,46 @@ class PostCRUD:
 
         self.db.delete(db_post)
         self.db.commit()
+        _post_image_cache.invalidate(post_id)
         return True
 
     def get_post_image(self, post_id: int) -> Optional[Tuple[bytes, str, str]]:
         """Get post image data, content type, and filename"""
+        cached = _post_image_cache.get(post_id)
+        if cached is not None:
+            return cached
+
         db_post = self.get_by_id(post_id)
-        if not db_post or not db_post.image_data:
+        if not db_post:
             return None
-        
-        return db_post.image_data, db_post.image_content_type, db_post.image_filename
+
+        image_bytes = self._image_bytes(db_post)
+        if not image_bytes:
+            return None
+
+        image = (image_bytes, db_post.image_content_type, db_post.image_filename)
+        _post_image_cache.set(post_id, image)
+        return image
+
+    def _bump_feedback_counter(self, post_id: int, feedback_type: FeedbackType, delta: int) -> None:
+        """Apply a feedback counter delta atomically in SQL
+
+        Counters live in post_feedback_counters, one row per post, so votes
+        lock that row instead of the hot posts row. The upsert creates the
+        counter row on the first vote and applies atomic deltas after that;
+        GREATEST keeps the clamp-at-zero behavior for decrements.
+        """
+        if feedback_type == FeedbackType.positive:
+            column = PostFeedbackCounter.positive
+        else:
+            column = PostFeedbackCounter.negative
+        values = {"post_id": post_id, "positive": 0, "negative": 0}
+        values[column.key] = max(delta, 0)
+        stmt = mysql_insert(PostFeedbackCounter).values(**values)
+        stmt = stmt.on_duplicate_key_update(
+            **{column.key: func.greatest(column + delta, 0)}
+        )
+        self.db.execute(stmt)
 
     def add_feedback(self, post_id: int, user_id: int, feedback_data: FeedbackCreate) -> Optional[PostFeedback]:
         """Add or update user feedback for a post"""
@@ -189,19 +284,15 @@ class PostCRUD:
             # Update existing feedback
             old_feedback_type = existing_feedback.feedback_type
             existing_feedback.feedback_type = FeedbackType(feedback_data.feedback_type.value)
-            
+
             # Update counters
-            if old_feedback_type == FeedbackType.positive:
-                post.positive_feedbacks = max(0, post.positive_feedbacks - 1)
-            else:
-                post.negative_feedbacks = max(0, post.negative_feedbacks - 1)
-                
-            if existing_feedback.feedback_type == FeedbackType.positive:
-                post.positive_feedbacks += 1
-            else:
-                post.negative_feedbacks += 1
-                
+            if old_feedback_type != existing_feedback.feedback_type:
+                self._bump_feedback_counter(post_id, old_feedback_type, -1)
+                self._bump_feedback_counter(post_id, existing_feedback.feedback_type, +1)
+
             self.db.commit()
+            # Counter deltas ran as raw UPDATEs - expire the loaded values
+            self.db.expire(post, ["feedback_counter"])
             self.db.refresh(existing_feedback)
             return existing_feedback
         else:
@@ -212,14 +303,13 @@ class PostCRUD:
                 feedback_type=FeedbackType(feedback_data.feedback_type.value)
             )
             self.db.add(db_feedback)
-            
+
             # Update counters
-            if db_feedback.feedback_type == FeedbackType.positive:
-                post.positive_feedbacks += 1
-            else:
-                post.negative_feedbacks += 1
-                
+            self._bump_feedback_counter(post_id, db_feedback.feedback_type, +1)
+
             self.db.commit()
+            # Counter deltas ran as raw UPDATEs - expire the loaded values
+            self.db.expire(post, ["feedback_counter"])
             self.db.refresh(db_feedback)
             return db_feedback
 
@@ -232,13 +322,8 @@ class PostCRUD:
         if not feedback:
             return False
 
-        # Get the post and update counters
-        post = self.get_by_id(post_id)
-        if post:
-            if feedback.feedback_type == FeedbackType.positive:
-                post.positive_feedbacks = max(0, post.positive_feedbacks - 1)
-            else:
-                post.negative_feedbacks = max(0, post.negative_feedbacks - 1)
+        # Update counters
+        self._bump_feedback_counter(post_id, feedback.feedback_type, -1)
 
         self.db.delete(feedback)
         self.db.commit()
@@ -246,22 +331,34 @@ class PostCRUD:
 
     def get_user_feedback(self, post_id: int, user_id: int) -> Optional[PostFeedback]:
         """Get user's feedback for a specific post"""
-        return self.db.query(PostFeedback).filter(
-            and_(PostFeedback.post_id == post_id, PostFeedback.user_id == user_id)
-        ).first()
+        stmt = select(PostFeedback).where(
+            PostFeedback.post_id == post_id, PostFeedback.user_id == user_id
+        )
+        return self.db.execute(stmt).scalars().first()
 
     def get_posts_with_user_feedback(self, user_id: int, skip: int = 0, limit: int = 100, include_images: bool = False) -> List[dict]:
         """Get posts with user's feedback status"""
         posts = self.get_active_posts(skip=skip, limit=limit)
         result = []
-        
+
+        # Fetch the user's feedback for the whole page in one query instead
+        # of one get_user_feedback round trip per post
+        feedback_by_post = {}
+        post_ids = [post.id for post in posts]
+        if post_ids:
+            stmt = select(PostFeedback).where(
+                PostFeedback.user_id == user_id, PostFeedback.post_id.in_(post_ids)
+            )
+            for feedback in self.db.execute(stmt).scalars():
+                feedback_by_post[feedback.post_id] = feedback
+
         for post in posts:
-            user_feedback = self.get_user_feedback(post.id, user_id)
+            user_feedback = feedback_by_post.get(post.id)
             post_dict = {
                 "id": post.id,
                 "header": post.header,
                 "description": post.description,
-                "image_url": f"/api/v1/posts/{post.id}/image" if post.image_data else None,
+                "image_url": f"/api/v1/posts/{post.id}/image" if post.image_filename else None,
                 "image_filename": post.image_filename,
                 "positive_feedbacks": post.positive_feedbacks,
                 "negative_feedbacks": post.negative_feedbacks,
@@ -272,9 +369,24 @@ class PostCRUD:
             }
             
             # Include base64 image data if requested
-            if include_images and post.image_data and post.image_content_type:
-                post_dict["image_data"] = image_to_base64(post.image_data, post.image_content_type)
-                post_dict["image_info"] = get_image_info(post.image_data)
+            if include_images and post.image_filename and post.image_content_type:
+                post_bytes = self._image_bytes(post)
+                if post_bytes:
+                    post_dict["image_data"] = image_to_base64_cached(
+                        ("post_image", post.id, post.updated_at),
+                        post_bytes, post.image_content_type
+                    )
+                    # Dimensions are cached on the row at write time; only
+                    # legacy rows without them fall back to a PIL open
+                    if post.image_width is not None:
+                        post_dict["image_info"] = {
+                            "width": post.image_width,
+                            "height": post.image_height,
+                            "size": post.image_size or len(post_bytes),
+                            "format": "JPEG"
+                        }
+                    else:
+                        post_dict["image_info"] = get_image_info(post_bytes)
             
             result.append(post_dict)
             
@@ -296,7 +408,7 @@ class PostCRUD:
             return db_section
         except Exception as e:
             self.db.rollback()
-            print(f"Error creating text section: {e}")
+            logger.exception("Error creating text section")
             return None
 
     async def create_image_section(self, post_id: int, order_index: int, image_file: UploadFile) -> Optional[PostSection]:
@@ -308,18 +420,14 @@ class PostCRUD:
             db_section = PostSection(
                 post_id=post_id,
                 section_type=SectionType.image,
-                order_index=order_index,
-                image_data=image_data,
-                image_filename=filename,
-                image_content_type=content_type
+                order_index=order_index
             )
-            self.db.add(db_section)
-            self.db.commit()
-            self.db.refresh(db_section)
+            self._store_image(db_section, image_data, filename, content_type)
+            await run_in_threadpool(self._persist, db_section)
             return db_section
         except Exception as e:
             self.db.rollback()
-            print(f"Error creating image section: {e}")
+            logger.exception("Error creating image section")
             return None
 
     def create_video_section(self, post_id: int, section_data: VideoSectionCreate) -> Optional[PostSection]:
@@ -337,9 +445,61 @@ class PostCRUD:
             return db_section
         except Exception as e:
             self.db.rollback()
-            print(f"Error creating video section: {e}")
+            logger.exception("Error creating video section")
             return None
 
+    # Bulk section creation - used by the complete-post endpoint so N
+    # sections cost one INSERT round trip instead of N add/commit cycles
+    @staticmethod
+    def _blank_section_row(section_type: SectionType, order_index: int) -> dict:
+        """Section row with the full column set (multi-row INSERT needs uniform keys)"""
+        return {
+            "section_type": section_type,
+            "order_index": order_index,
+            "text_content": None,
+            "image_data": None,
+            "blob_storage_key": None,
+            "image_size": None,
+            "image_width": None,
+            "image_height": None,
+            "image_filename": None,
+            "image_content_type": None,
+            "video_url": None,
+            "video_filename": None
+        }
+
+    def build_text_section_row(self, section_data: TextSectionCreate) -> dict:
+        """Build an insertable row for a text section"""
+        row = self._blank_section_row(SectionType.text, section_data.order_index)
+        row["text_content"] = section_data.text_content
+        return row
+
+    def build_video_section_row(self, section_data: VideoSectionCreate) -> dict:
+        """Build an insertable row for a video section"""
+        row = self._blank_section_row(SectionType.video, section_data.order_index)
+        row["video_url"] = section_data.video_url
+        return row
+
+    async def build_image_section_row(self, order_index: int, image_file: UploadFile) -> dict:
+        """Build an insertable row for an image section (processes the upload)"""
+        image_data, filename, content_type = await process_uploaded_image(image_file)
+        row = self._blank_section_row(SectionType.image, order_index)
+        row.update(self._image_row_values(image_data, filename, content_type))
+        return row
+
+    def create_sections_bulk(self, post_id: int, rows: List[dict]) -> int:
+        """Insert all sections for a post with a single multi-row INSERT"""
+        if not rows:
+            return 0
+        for row in rows:
+            row["post_id"] = post_id
+        self.db.execute(insert(PostSection).values(rows))
+        self.db.commit()
+        # The core INSERT bypassed the ORM - expire session state so an
+        # already-loaded parent post re-reads its sections
+        self.db.expire_all()
+        return len(rows)
+
     def get_post_sections(self, post_id: int) -> List[PostSection]:
         """Get all sections for a post, ordered by order_index"""
         return self.db.query(PostSection).filter(
@@ -365,25 +525,62 @@ class PostCRUD:
         if section:
             self.db.delete(section)
             self.db.commit()
+            _section_image_cache.invalidate(section_id)
             return True
         return False
 
     def get_section_image(self, section_id: int) -> Optional[Tuple[bytes, str, str]]:
         """Get section image data, content type, and filename"""
+        cached = _section_image_cache.get(section_id)
+        if cached is not None:
+            return cached
+
         section = self.get_section_by_id(section_id)
-        if section and section.section_type == SectionType.image and section.image_data:
-            return section.image_data, section.image_content_type, section.image_filename
+        if section and section.section_type == SectionType.image:
+            image_bytes = self._image_bytes(section)
+            if image_bytes:
+                image = (image_bytes, section.image_content_type, section.image_filename)
+                _section_image_cache.set(section_id, image)
+                return image
         return None
 
+    def convert_section_to_dict(self, section: PostSection, include_image_data: bool = False) -> dict:
+        """Convert a PostSection object to a dictionary with optional image data"""
+        section_dict = {
+            "id": section.id,
+            "section_type": section.section_type.value,
+            "order_index": section.order_index,
+            "text_content": section.text_content,
+            "image_url": f"/api/v1/posts/sections/{section.id}/image" if section.image_filename else None,
+            "image_filename": section.image_filename,
+            "video_url": section.video_url,
+            "video_filename": section.video_filename,
+            "created_at": section.created_at.isoformat() if section.created_at else None,
+            "updated_at": section.updated_at.isoformat() if section.updated_at else None,
+            "image_data": None
+        }
+
+        # Include base64 encoded section image data if requested
+        if include_image_data:
+            section_bytes = self._image_bytes(section) if section.image_filename else None
+            if section_bytes:
+                try:
+                    section_dict["image_data"] = image_to_base64_cached(
+                        ("section_image", section.id, section.updated_at),
+                        section_bytes, section.image_content_type or "image/jpeg"
+                    )
+                except Exception as e:
+                    logger.exception("Error encoding section image data")
+
+        return section_dict
+
     def convert_post_to_dict(self, post: Post, include_sections: bool = True, include_image_data: bool = False) -> dict:
         """Convert Post object to dictionary with sections and optional image data"""
-        import base64
-        
         post_dict = {
             "id": post.id,
             "header": post.header,
             "description": post.description,
-            "image_url": f"/api/v1/posts/{post.id}/image" if post.image_data else None,
+            "image_url": f"/api/v1/posts/{post.id}/image" if post.image_filename else None,
             "image_filename": post.image_filename,
             "positive_feedbacks": post.positive_feedbacks,
             "negative_feedbacks": post.negative_feedbacks,
@@ -393,44 +590,23 @@ class PostCRUD:
         }
         
         # Include base64 encoded main post image data if requested
-        if include_image_data and post.image_data:
-            try:
-                image_b64 = base64.b64encode(post.image_data).decode('utf-8')
-                post_dict["image_data"] = f"data:{post.image_content_type or 'image/jpeg'};base64,{image_b64}"
-            except Exception as e:
-                print(f"Error encoding post image data: {e}")
-                post_dict["image_data"] = None
-        else:
-            post_dict["image_data"] = None
+        post_dict["image_data"] = None
+        if include_image_data:
+            post_bytes = self._image_bytes(post) if post.image_filename else None
+            if post_bytes:
+                try:
+                    post_dict["image_data"] = image_to_base64_cached(
+                        ("post_image", post.id, post.updated_at),
+                        post_bytes, post.image_content_type or "image/jpeg"
+                    )
+                except Exception as e:
+                    logger.exception("Error encoding post image data")
         
         if include_sections:
-            sections = []
-            for section in post.sections:
-                section_dict = {
-                    "id": section.id,
-                    "section_type": section.section_type.value,
-                    "order_index": section.order_index,
-                    "text_content": section.text_content,
-                    "image_url": f"/api/v1/posts/sections/{section.id}/image" if section.image_data else None,
-                    "image_filename": section.image_filename,
-                    "video_url": section.video_url,
-                    "video_filename": section.video_filename,
-                    "created_at": section.created_at.isoformat() if section.created_at else None,
-                    "updated_at": section.updated_at.isoformat() if section.updated_at else None
-                }
-                
-                # Include base64 encoded section image data if requested
-                if include_image_data and section.image_data:
-                    try:
-                        section_image_b64 = base64.b64encode(section.image_data).decode('utf-8')
-                        section_dict["image_data"] = f"data:{section.image_content_type or 'image/jpeg'};base64,{section_image_b64}"
-                    except Exception as e:
-                        print(f"Error encoding section image data: {e}")
-                        section_dict["image_data"] = None
-                else:
-                    section_dict["image_data"] = None
-                
-                sections.append(section_dict)
-            post_dict["sections"] = sections
-        
+            # Sections are already ordered by the relationship; convert in one pass
+            post_dict["sections"] = [
+                self.convert_section_to_dict(section, include_image_data=include_image_data)
+                for section in post.sections
+            ]
+
         return post_dict
@@ -8,11 +8,17 @@ engine = create_engine(
     settings.DATABASE_URL,
     pool_pre_ping=True,
     pool_recycle=300,
-    echo=True  # Set to False in production
+    echo=True,  # Set to False in production
+    # Shared compiled-statement cache so hot select() statements skip
+    # re-compilation on every call
+    execution_options={"compiled_cache": {}}
 )
 
 # Create SessionLocal class
-SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+# expire_on_commit=False: objects stay usable after commit instead of
+# re-SELECTing every attribute the next time they are touched. CRUD methods
+# call refresh()/expire() explicitly where server-generated state matters.
+SessionLocal = sessionmaker(autocommit=False, autoflush=False, expire_on_commit=False, bind=engine)
 
 # Create Base class for models
 Base = declarative_base()
@@ -1,7 +1,15 @@
-from fastapi import FastAPI
+import anyio.to_thread
+from fastapi import FastAPI, Request
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import ORJSONResponse
 from fastapi.security import HTTPBearer
 
+from utils.log_utils import configure_logging, get_logger, should_trace, RequestTimer
+from utils.qr_utils import generate_qr_code, generate_qr_code_svg
+
+configure_logging()
+logger = get_logger(__name__)
+
 from db.database import engine, Base
 from api.users import router as users_router
 from api.auth import router as auth_router
@@ -32,6 +40,8 @@ app = FastAPI(
     - **ADMIN**: Full access to all endpoints including admin panel
     """,
     version="1.0.0",
+    # orjson serializes responses several times faster than stdlib json
+    default_response_class=ORJSONResponse,
     # Add security scheme for Swagger UI
     openapi_tags=[
         {
@@ -57,6 +67,55 @@ app = FastAPI(
     ]
 )
 
+@app.on_event("startup")
+async def configure_threadpool():
+    """
+    Grow the default AnyIO thread limiter (40 tokens) so sync endpoints and
+    run_in_threadpool DB calls don't queue behind each other under load.
+    """
+    anyio.to_thread.current_default_thread_limiter().total_tokens = 100
+
+@app.on_event("startup")
+async def warm_response_schemas():
+    """
+    Build pydantic core schemas for the hot response models up front, so the
+    first request to each endpoint doesn't pay the one-off schema build cost.
+    """
+    from schemas import (
+        PostResponse, PostWithImage, PostWithUserFeedback, PostSectionResponse,
+        DeviceResponse, DeviceListResponse, UserResponse
+    )
+    for cls in (
+        PostResponse, PostWithImage, PostWithUserFeedback, PostSectionResponse,
+        DeviceResponse, DeviceListResponse, UserResponse
+    ):
+        cls.model_json_schema()
+        cls.model_construct()
+
+@app.on_event("startup")
+async def warm_qr_pipeline():
+    """
+    Generate one throwaway QR per format so the first real request doesn't
+    pay the cold cost: qrcode's lazy imports, the blank module-grid template
+    and the Reed-Solomon generator polynomial caches all populate here.
+    """
+    generate_qr_code("warmup")
+    generate_qr_code_svg("warmup")
+
+@app.middleware("http")
+async def trace_requests(request: Request, call_next):
+    """Log timing for a sampled fraction of requests (see TRACE_SAMPLE_RATE)"""
+    if not should_trace():
+        return await call_next(request)
+
+    timer = RequestTimer()
+    response = await call_next(request)
+    logger.info(
+        "trace method=%s path=%s status=%s duration_ms=%.1f",
+        request.method, request.url.path, response.status_code, timer.elapsed_ms()
+    )
+    return response
+
 # Add CORS middleware
 app.add_middleware(
     CORSMiddleware,
@@ -0,0 +1,114 @@
+-- Migration for the snowflake-id / media-store / feedback-counter series.
+--
+-- Base.metadata.create_all only creates tables that don't exist yet - it
+-- never alters existing ones - so databases created before this series
+-- must be brought up to date with this script BEFORE deploying the new
+-- code. Fresh databases need nothing: create_all builds the final schema.
+--
+-- What changed and why each statement is needed:
+--   * posts/post_sections/post_feedbacks ids are now app-generated
+--     snowflake values (~2^58); the old INT auto-increment columns
+--     overflow on the first insert unless widened to BIGINT.
+--   * posts/post_sections grew blob_storage_key/image_size/image_width/
+--     image_height, and devices grew qr_data - columns every SELECT of
+--     those models now references.
+--   * posts.positive_feedbacks/negative_feedbacks moved to the
+--     post_feedback_counters table; the counts must be backfilled there
+--     BEFORE the old columns are dropped or they are silently zeroed.
+--   * Enum columns moved from native MySQL ENUM to VARCHAR + CHECK
+--     (values are unchanged - SQLAlchemy stores the enum member names).
+--
+-- Run inside a maintenance window; the BIGINT conversions rewrite the
+-- tables. Foreign-key constraint names below are MySQL's defaults
+-- (<table>_ibfk_N); if your instance differs, look them up first:
+--   SELECT TABLE_NAME, CONSTRAINT_NAME FROM information_schema.KEY_COLUMN_USAGE
+--   WHERE REFERENCED_TABLE_NAME = 'posts' AND TABLE_SCHEMA = DATABASE();
+
+-- ---------------------------------------------------------------------------
+-- 1. New columns read by the current models
+-- ---------------------------------------------------------------------------
+
+ALTER TABLE posts
+    ADD COLUMN blob_storage_key VARCHAR(512) NULL AFTER image_data,
+    ADD COLUMN image_size INT NULL AFTER blob_storage_key,
+    ADD COLUMN image_width INT NULL AFTER image_size,
+    ADD COLUMN image_height INT NULL AFTER image_width;
+
+ALTER TABLE post_sections
+    ADD COLUMN blob_storage_key VARCHAR(512) NULL AFTER image_data,
+    ADD COLUMN image_size INT NULL AFTER blob_storage_key,
+    ADD COLUMN image_width INT NULL AFTER image_size,
+    ADD COLUMN image_height INT NULL AFTER image_width;
+
+ALTER TABLE devices
+    ADD COLUMN qr_data TEXT NULL AFTER qr_code_data;
+
+-- ---------------------------------------------------------------------------
+-- 2. Feedback counters: create, backfill, then drop the old columns.
+--    The INSERT must run before the DROP or existing counts are lost.
+-- ---------------------------------------------------------------------------
+
+CREATE TABLE IF NOT EXISTS post_feedback_counters (
+    post_id BIGINT NOT NULL,
+    positive INT NOT NULL DEFAULT 0,
+    negative INT NOT NULL DEFAULT 0,
+    PRIMARY KEY (post_id)
+) ENGINE=InnoDB;
+
+INSERT INTO post_feedback_counters (post_id, positive, negative)
+SELECT id, positive_feedbacks, negative_feedbacks FROM posts
+ON DUPLICATE KEY UPDATE positive = VALUES(positive), negative = VALUES(negative);
+
+ALTER TABLE posts
+    DROP COLUMN positive_feedbacks,
+    DROP COLUMN negative_feedbacks;
+
+-- ---------------------------------------------------------------------------
+-- 3. Widen the snowflake-id primary keys to BIGINT.
+--    Referencing columns and the referenced key must change together, so
+--    drop the foreign keys first and re-add them afterwards.
+-- ---------------------------------------------------------------------------
+
+ALTER TABLE post_sections DROP FOREIGN KEY post_sections_ibfk_1;
+ALTER TABLE post_feedbacks DROP FOREIGN KEY post_feedbacks_ibfk_1;
+
+ALTER TABLE posts MODIFY id BIGINT NOT NULL;
+ALTER TABLE post_sections
+    MODIFY id BIGINT NOT NULL,
+    MODIFY post_id BIGINT NOT NULL;
+ALTER TABLE post_feedbacks
+    MODIFY id BIGINT NOT NULL,
+    MODIFY post_id BIGINT NOT NULL;
+
+ALTER TABLE post_sections
+    ADD CONSTRAINT post_sections_ibfk_1 FOREIGN KEY (post_id) REFERENCES posts (id);
+ALTER TABLE post_feedbacks
+    ADD CONSTRAINT post_feedbacks_ibfk_1 FOREIGN KEY (post_id) REFERENCES posts (id);
+ALTER TABLE post_feedback_counters
+    ADD CONSTRAINT post_feedback_counters_ibfk_1 FOREIGN KEY (post_id) REFERENCES posts (id);
+
+-- ---------------------------------------------------------------------------
+-- 4. One-feedback-per-user constraint and the per-post counting index
+-- ---------------------------------------------------------------------------
+
+ALTER TABLE post_feedbacks
+    ADD CONSTRAINT uq_feedback_user_post UNIQUE (post_id, user_id),
+    ADD INDEX ix_feedback_post_type (post_id, feedback_type);
+
+-- ---------------------------------------------------------------------------
+-- 5. Native ENUM columns to VARCHAR + CHECK. Stored values are the enum
+--    member names, identical before and after, so no data rewrite beyond
+--    the type change.
+-- ---------------------------------------------------------------------------
+
+ALTER TABLE users
+    MODIFY user_type VARCHAR(16) NOT NULL,
+    ADD CONSTRAINT ck_users_user_type CHECK (user_type IN ('USER', 'ADMIN'));
+
+ALTER TABLE post_sections
+    MODIFY section_type VARCHAR(16) NOT NULL,
+    ADD CONSTRAINT ck_post_sections_section_type CHECK (section_type IN ('text', 'image', 'video'));
+
+ALTER TABLE post_feedbacks
+    MODIFY feedback_type VARCHAR(16) NOT NULL,
+    ADD CONSTRAINT ck_post_feedbacks_feedback_type CHECK (feedback_type IN ('positive', 'negative'));
@@ -18,6 +18,7 @@ class Device(Base):
     
     # QR code data
     qr_code_data = Column(LargeBinary, nullable=True)  # Generated QR code image
+    qr_data = Column(Text, nullable=True)  # JSON payload the image encodes
     
     is_active = Column(Boolean, default=True)
     created_at = Column(DateTime(timezone=True), server_default=func.now())
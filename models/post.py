@@ -1,9 +1,16 @@
-from sqlalchemy import Column, Integer, String, Text, DateTime, Boolean, ForeignKey, Enum, LargeBinary
-from sqlalchemy.orm import relationship
+from sqlalchemy import Column, BigInteger, Integer, String, Text, DateTime, Boolean, ForeignKey, Enum, LargeBinary, UniqueConstraint, Index
+from sqlalchemy.orm import relationship, deferred
 from sqlalchemy.sql import func
 from db.database import Base
+from datetime import datetime, timezone
+from utils.idgen import next_id
 import enum
 
+def _utcnow():
+    """Client-side created_at default so new rows don't need a refresh
+    round trip just to read back the server clock"""
+    return datetime.now(timezone.utc)
+
 class FeedbackType(enum.Enum):
     positive = "positive"
     negative = "negative"
@@ -13,65 +20,127 @@ class SectionType(enum.Enum):
     image = "image"
     video = "video"
 
+# Enum columns are stored as VARCHAR + CHECK (native_enum=False) rather
+# than MySQL ENUM: adding a value is a cheap constraint change instead of
+# an ALTER of the column type, and rows skip the native enum handling on
+# fetch. Python code keeps using the enum classes unchanged.
+def _enum_column_type(enum_class):
+    return Enum(enum_class, native_enum=False, length=16, create_constraint=True, validate_strings=True)
+
 class Post(Base):
     __tablename__ = "posts"
     
-    id = Column(Integer, primary_key=True, index=True)
+    # App-generated snowflake id: known before flush, so parent and child
+    # rows can be inserted without an auto-increment round trip
+    id = Column(BigInteger, primary_key=True, index=True, default=next_id, autoincrement=False)
     header = Column(String(200), nullable=False)
     description = Column(Text, nullable=True)  # Optional post description
     
     # Main post image (featured/cover image)
-    image_data = Column(LargeBinary, nullable=True)  # Main post image as binary data
+    # Deferred: only loaded when the bytes are actually accessed, so list
+    # queries never pull blobs (presence checks use image_filename)
+    image_data = deferred(Column(LargeBinary, nullable=True), group="blob")  # Inline bytes (small images / legacy rows)
+    blob_storage_key = Column(String(512), nullable=True)  # Media-store key for out-of-row bytes
+    image_size = Column(Integer, nullable=True)  # Processed image size in bytes
+    image_width = Column(Integer, nullable=True)  # Cached at write time - avoids PIL open per response
+    image_height = Column(Integer, nullable=True)
     image_filename = Column(String(255), nullable=True)  # Original filename
     image_content_type = Column(String(100), nullable=True)  # MIME type
     
-    positive_feedbacks = Column(Integer, default=0, nullable=False)
-    negative_feedbacks = Column(Integer, default=0, nullable=False)
     is_active = Column(Boolean, default=True)
-    created_at = Column(DateTime(timezone=True), server_default=func.now())
+    created_at = Column(DateTime(timezone=True), default=_utcnow, server_default=func.now())
     updated_at = Column(DateTime(timezone=True), onupdate=func.now())
     
     # Relationships
-    sections = relationship("PostSection", back_populates="post", cascade="all, delete-orphan", order_by="PostSection.order_index")
-    feedbacks = relationship("PostFeedback", back_populates="post", cascade="all, delete-orphan")
+    # Sections are read on every post conversion, so batch-load them with
+    # selectin instead of one lazy SELECT per post
+    sections = relationship(
+        "PostSection",
+        back_populates="post",
+        cascade="all, delete-orphan",
+        order_by="PostSection.order_index",
+        lazy="selectin"
+    )
+    # Feedbacks are only touched by the feedback endpoints - keep lazy
+    feedbacks = relationship("PostFeedback", back_populates="post", cascade="all, delete-orphan", lazy="select")
+    # Feedback counters live in their own one-row-per-post table so votes
+    # update that row instead of contending on the hot posts row; selectin
+    # keeps page loads at one extra batched query
+    feedback_counter = relationship(
+        "PostFeedbackCounter",
+        back_populates="post",
+        uselist=False,
+        cascade="all, delete-orphan",
+        lazy="selectin"
+    )
+
+    @property
+    def positive_feedbacks(self) -> int:
+        return self.feedback_counter.positive if self.feedback_counter else 0
+
+    @property
+    def negative_feedbacks(self) -> int:
+        return self.feedback_counter.negative if self.feedback_counter else 0
 
 class PostSection(Base):
     __tablename__ = "post_sections"
-    
-    id = Column(Integer, primary_key=True, index=True)
-    post_id = Column(Integer, ForeignKey("posts.id"), nullable=False)
-    section_type = Column(Enum(SectionType), nullable=False)
+
+    id = Column(BigInteger, primary_key=True, index=True, default=next_id, autoincrement=False)
+    post_id = Column(BigInteger, ForeignKey("posts.id"), nullable=False)
+    section_type = Column(_enum_column_type(SectionType), nullable=False)
     order_index = Column(Integer, nullable=False, default=0)  # For ordering sections
     
     # Content fields - only one will be used based on section_type
     text_content = Column(Text, nullable=True)  # For text sections
-    image_data = Column(LargeBinary, nullable=True)  # For image sections
+    image_data = deferred(Column(LargeBinary, nullable=True), group="blob")  # For image sections (inline/legacy, deferred)
+    blob_storage_key = Column(String(512), nullable=True)  # Media-store key for out-of-row bytes
+    image_size = Column(Integer, nullable=True)  # Processed image size in bytes
+    image_width = Column(Integer, nullable=True)  # Cached at write time
+    image_height = Column(Integer, nullable=True)
     image_filename = Column(String(255), nullable=True)
     image_content_type = Column(String(100), nullable=True)
     video_url = Column(String(500), nullable=True)  # For video sections (YouTube, Vimeo, etc.)
     video_filename = Column(String(255), nullable=True)  # For uploaded videos
     
-    created_at = Column(DateTime(timezone=True), server_default=func.now())
+    created_at = Column(DateTime(timezone=True), default=_utcnow, server_default=func.now())
     updated_at = Column(DateTime(timezone=True), onupdate=func.now())
     
     # Relationship
-    post = relationship("Post", back_populates="sections")
+    post = relationship("Post", back_populates="sections", lazy="select")
 
 class PostFeedback(Base):
     __tablename__ = "post_feedbacks"
-    
-    id = Column(Integer, primary_key=True, index=True)
-    post_id = Column(Integer, ForeignKey("posts.id"), nullable=False)
+
+    id = Column(BigInteger, primary_key=True, index=True, default=next_id, autoincrement=False)
+    post_id = Column(BigInteger, ForeignKey("posts.id"), nullable=False)
     user_id = Column(Integer, ForeignKey("users.id"), nullable=False)
-    feedback_type = Column(Enum(FeedbackType), nullable=False)
-    created_at = Column(DateTime(timezone=True), server_default=func.now())
+    feedback_type = Column(_enum_column_type(FeedbackType), nullable=False)
+    created_at = Column(DateTime(timezone=True), default=_utcnow, server_default=func.now())
     updated_at = Column(DateTime(timezone=True), onupdate=func.now())
     
     # Relationships
-    post = relationship("Post", back_populates="feedbacks")
-    user = relationship("User")
+    post = relationship("Post", back_populates="feedbacks", lazy="select")
+    user = relationship("User", back_populates="feedbacks", lazy="select")
     
-    # Ensure one feedback per user per post
+    # Ensure one feedback per user per post (DB-level, closes the race the
+    # check-then-insert in add_feedback leaves open) and make per-post
+    # positive/negative counting an index-only scan
     __table_args__ = (
+        UniqueConstraint("post_id", "user_id", name="uq_feedback_user_post"),
+        Index("ix_feedback_post_type", "post_id", "feedback_type"),
         {"mysql_engine": "InnoDB"},
     )
+
+class PostFeedbackCounter(Base):
+    """Materialised feedback counters, one row per post.
+
+    Votes upsert this row with atomic deltas (see PostCRUD), so trending
+    posts don't serialise voters through row locks on the posts table.
+    """
+    __tablename__ = "post_feedback_counters"
+
+    post_id = Column(BigInteger, ForeignKey("posts.id"), primary_key=True, autoincrement=False)
+    positive = Column(Integer, default=0, nullable=False)
+    negative = Column(Integer, default=0, nullable=False)
+
+    post = relationship("Post", back_populates="feedback_counter", lazy="select")
@@ -1,4 +1,5 @@
 from sqlalchemy import Column, Integer, String, DateTime, Boolean, Enum
+from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
 from db.database import Base
 import enum
@@ -16,7 +17,16 @@ class User(Base):
     full_name = Column(String(100), nullable=False)
     phone = Column(String(20), nullable=True, index=True)
     hashed_password = Column(String(255), nullable=False)
-    user_type = Column(Enum(UserType), default=UserType.USER, nullable=False)
+    # Stored as VARCHAR + CHECK (native_enum=False): avoids MySQL ENUM
+    # ALTER friction and the per-connection type handling of native enums,
+    # while Python code keeps working with the UserType enum
+    user_type = Column(
+        Enum(UserType, native_enum=False, length=16, create_constraint=True, validate_strings=True),
+        default=UserType.USER, nullable=False
+    )
     is_active = Column(Boolean, default=True)
     created_at = Column(DateTime(timezone=True), server_default=func.now())
     updated_at = Column(DateTime(timezone=True), onupdate=func.now())
+
+    # Relationships
+    feedbacks = relationship("PostFeedback", back_populates="user", lazy="select")
@@ -3,6 +3,10 @@ from typing import Optional
 from datetime import datetime
 import re
 
+# Compiled once at import time - these run on every request validation
+DEVICE_NAME_RE = re.compile(r'^[a-zA-Z0-9\s\-_]+$')
+VERSION_RE = re.compile(r'^[vV]?[\d]+\.[\d]+(?:\.[\d]+)?(?:[-\w]*)?$')
+
 
 class DeviceBase(BaseModel):
     device_name: str = Field(..., min_length=1, max_length=200, description="Device name")
@@ -14,7 +18,7 @@ class DeviceBase(BaseModel):
         if not v or not v.strip():
             raise ValueError('Device name cannot be empty')
         # Allow letters, numbers, spaces, hyphens, underscores
-        if not re.match(r'^[a-zA-Z0-9\s\-_]+$', v.strip()):
+        if not DEVICE_NAME_RE.match(v.strip()):
             raise ValueError('Device name can only contain letters, numbers, spaces, hyphens, and underscores')
         return v.strip()
     
@@ -23,7 +27,7 @@ class DeviceBase(BaseModel):
         if not v or not v.strip():
             raise ValueError('Version cannot be empty')
         # Allow version patterns like 1.0, v1.2.3, 2.0.1-beta, etc.
-        if not re.match(r'^[vV]?[\d]+\.[\d]+(?:\.[\d]+)?(?:[-\w]*)?$', v.strip()):
+        if not VERSION_RE.match(v.strip()):
             raise ValueError('Version must follow format like 1.0, v1.2.3, or 2.0.1-beta')
         return v.strip()
 
@@ -45,7 +49,7 @@ class DeviceUpdate(BaseModel):
         if v is not None:
             if not v or not v.strip():
                 raise ValueError('Device name cannot be empty')
-            if not re.match(r'^[a-zA-Z0-9\s\-_]+$', v.strip()):
+            if not DEVICE_NAME_RE.match(v.strip()):
                 raise ValueError('Device name can only contain letters, numbers, spaces, hyphens, and underscores')
             return v.strip()
         return v
@@ -55,7 +59,7 @@ class DeviceUpdate(BaseModel):
         if v is not None:
             if not v or not v.strip():
                 raise ValueError('Version cannot be empty')
-            if not re.match(r'^[vV]?[\d]+\.[\d]+(?:\.[\d]+)?(?:[-\w]*)?$', v.strip()):
+            if not VERSION_RE.match(v.strip()):
                 raise ValueError('Version must follow format like 1.0, v1.2.3, or 2.0.1-beta')
             return v.strip()
         return v
@@ -4,10 +4,59 @@ from typing import Optional
 from enum import Enum
 import re
 
+# Compiled once at import time - these run on every request validation
+USERNAME_RE = re.compile(r'^[a-zA-Z0-9_]+$')
+PHONE_STRIP_RE = re.compile(r'[^\d+]')
+PHONE_RE = re.compile(r'^\+?[1-9]\d{7,14}$')
+
 class UserTypeEnum(str, Enum):
     USER = "USER"
     ADMIN = "ADMIN"
 
+# Shared field validators - reused across UserBase, UserRegister, UserCreate
+# and UserUpdate so each rule lives in exactly one place. All are
+# None-tolerant so the optional-field update schemas can reuse them as-is.
+def clean_username(v: Optional[str]) -> Optional[str]:
+    if v is None:
+        return v
+    if not v or len(v.strip()) < 3:
+        raise ValueError('Username must be at least 3 characters long')
+    if len(v) > 50:
+        raise ValueError('Username must not exceed 50 characters')
+    if not USERNAME_RE.match(v):
+        raise ValueError('Username can only contain letters, numbers, and underscores')
+    return v.strip()
+
+def clean_full_name(v: Optional[str]) -> Optional[str]:
+    if v is None:
+        return v
+    if not v or len(v.strip()) < 2:
+        raise ValueError('Full name must be at least 2 characters long')
+    if len(v) > 100:
+        raise ValueError('Full name must not exceed 100 characters')
+    return v.strip()
+
+def clean_phone(v: Optional[str]) -> Optional[str]:
+    if v is None:
+        return v
+    # Remove all non-digit characters except +
+    phone_clean = PHONE_STRIP_RE.sub('', v)
+
+    # Check if it's a valid phone number format
+    if not PHONE_RE.match(phone_clean):
+        raise ValueError('Phone number must be 8-15 digits, optionally starting with +')
+
+    return phone_clean
+
+def clean_password(v: Optional[str]) -> Optional[str]:
+    if v is None:
+        return v
+    if len(v) < 6:
+        raise ValueError('Password must be at least 6 characters long')
+    if len(v) > 100:
+        raise ValueError('Password must not exceed 100 characters')
+    return v
+
 class UserBase(BaseModel):
     username: str
     email: EmailStr
@@ -15,48 +64,15 @@ class UserBase(BaseModel):
     phone: Optional[str] = None
     user_type: UserTypeEnum = UserTypeEnum.USER
     is_active: bool = True
-    
-    @validator('username')
-    def validate_username(cls, v):
-        if not v or len(v.strip()) < 3:
-            raise ValueError('Username must be at least 3 characters long')
-        if len(v) > 50:
-            raise ValueError('Username must not exceed 50 characters')
-        if not re.match(r'^[a-zA-Z0-9_]+$', v):
-            raise ValueError('Username can only contain letters, numbers, and underscores')
-        return v.strip()
-    
-    @validator('full_name')
-    def validate_full_name(cls, v):
-        if not v or len(v.strip()) < 2:
-            raise ValueError('Full name must be at least 2 characters long')
-        if len(v) > 100:
-            raise ValueError('Full name must not exceed 100 characters')
-        return v.strip()
-    
-    @validator('phone')
-    def validate_phone(cls, v):
-        if v is None:
-            return v
-        # Remove all non-digit characters except +
-        phone_clean = re.sub(r'[^\d+]', '', v)
-        
-        # Check if it's a valid phone number format
-        if not re.match(r'^\+?[1-9]\d{7,14}$', phone_clean):
-            raise ValueError('Phone number must be 8-15 digits, optionally starting with +')
-        
-        return phone_clean
+
+    _validate_username = validator('username', allow_reuse=True)(clean_username)
+    _validate_full_name = validator('full_name', allow_reuse=True)(clean_full_name)
+    _validate_phone = validator('phone', allow_reuse=True)(clean_phone)
 
 class UserCreate(UserBase):
     password: str
-    
-    @validator('password')
-    def validate_password(cls, v):
-        if len(v) < 6:
-            raise ValueError('Password must be at least 6 characters long')
-        if len(v) > 100:
-            raise ValueError('Password must not exceed 100 characters')
-        return v
+
+    _validate_password = validator('password', allow_reuse=True)(clean_password)
 
 # Public registration schema - no user_type field
 class UserRegister(BaseModel):
@@ -66,45 +82,11 @@ class UserRegister(BaseModel):
     full_name: str
     phone: Optional[str] = None
     password: str
-    
-    @validator('username')
-    def validate_username(cls, v):
-        if not v or len(v.strip()) < 3:
-            raise ValueError('Username must be at least 3 characters long')
-        if len(v) > 50:
-            raise ValueError('Username must not exceed 50 characters')
-        if not re.match(r'^[a-zA-Z0-9_]+$', v):
-            raise ValueError('Username can only contain letters, numbers, and underscores')
-        return v.strip()
-    
-    @validator('full_name')
-    def validate_full_name(cls, v):
-        if not v or len(v.strip()) < 2:
-            raise ValueError('Full name must be at least 2 characters long')
-        if len(v) > 100:
-            raise ValueError('Full name must not exceed 100 characters')
-        return v.strip()
-    
-    @validator('phone')
-    def validate_phone(cls, v):
-        if v is None:
-            return v
-        # Remove all non-digit characters except +
-        phone_clean = re.sub(r'[^\d+]', '', v)
-        
-        # Check if it's a valid phone number format
-        if not re.match(r'^\+?[1-9]\d{7,14}$', phone_clean):
-            raise ValueError('Phone number must be 8-15 digits, optionally starting with +')
-        
-        return phone_clean
-    
-    @validator('password')
-    def validate_password(cls, v):
-        if len(v) < 6:
-            raise ValueError('Password must be at least 6 characters long')
-        if len(v) > 100:
-            raise ValueError('Password must not exceed 100 characters')
-        return v
+
+    _validate_username = validator('username', allow_reuse=True)(clean_username)
+    _validate_full_name = validator('full_name', allow_reuse=True)(clean_full_name)
+    _validate_phone = validator('phone', allow_reuse=True)(clean_phone)
+    _validate_password = validator('password', allow_reuse=True)(clean_password)
 
 class UserUpdate(BaseModel):
     username: Optional[str] = None
@@ -114,57 +96,17 @@ class UserUpdate(BaseModel):
     password: Optional[str] = None
     user_type: Optional[UserTypeEnum] = None
     is_active: Optional[bool] = None
-    
-    @validator('username')
-    def validate_username(cls, v):
-        if v is None:
-            return v
-        if len(v.strip()) < 3:
-            raise ValueError('Username must be at least 3 characters long')
-        if len(v) > 50:
-            raise ValueError('Username must not exceed 50 characters')
-        if not re.match(r'^[a-zA-Z0-9_]+$', v):
-            raise ValueError('Username can only contain letters, numbers, and underscores')
-        return v.strip()
-    
-    @validator('full_name')
-    def validate_full_name(cls, v):
-        if v is None:
-            return v
-        if len(v.strip()) < 2:
-            raise ValueError('Full name must be at least 2 characters long')
-        if len(v) > 100:
-            raise ValueError('Full name must not exceed 100 characters')
-        return v.strip()
-    
-    @validator('phone')
-    def validate_phone(cls, v):
-        if v is None:
-            return v
-        # Remove all non-digit characters except +
-        phone_clean = re.sub(r'[^\d+]', '', v)
-        
-        # Check if it's a valid phone number format
-        if not re.match(r'^\+?[1-9]\d{7,14}$', phone_clean):
-            raise ValueError('Phone number must be 8-15 digits, optionally starting with +')
-        
-        return phone_clean
-    
-    @validator('password')
-    def validate_password(cls, v):
-        if v is None:
-            return v
-        if len(v) < 6:
-            raise ValueError('Password must be at least 6 characters long')
-        if len(v) > 100:
-            raise ValueError('Password must not exceed 100 characters')
-        return v
+
+    _validate_username = validator('username', allow_reuse=True)(clean_username)
+    _validate_full_name = validator('full_name', allow_reuse=True)(clean_full_name)
+    _validate_phone = validator('phone', allow_reuse=True)(clean_phone)
+    _validate_password = validator('password', allow_reuse=True)(clean_password)
 
 class UserResponse(UserBase):
     id: int
     created_at: datetime
     updated_at: Optional[datetime] = None
-    
+
     class Config:
         from_attributes = True
 
@@ -0,0 +1,45 @@
+import logging
+import random
+import sys
+import time
+
+from config import settings
+
+# Single place to control log format for the whole app
+LOG_FORMAT = "%(asctime)s %(levelname)s %(name)s %(message)s"
+
+_configured = False
+
+
+def configure_logging(level: int = logging.INFO) -> None:
+    """Configure root logging once (called from main.py at import time)"""
+    global _configured
+    if _configured:
+        return
+    logging.basicConfig(level=level, format=LOG_FORMAT, stream=sys.stdout)
+    _configured = True
+
+
+def get_logger(name: str) -> logging.Logger:
+    """Get a module logger (use get_logger(__name__))"""
+    return logging.getLogger(name)
+
+
+def should_trace() -> bool:
+    """Decide whether to trace this request based on TRACE_SAMPLE_RATE"""
+    rate = settings.TRACE_SAMPLE_RATE
+    if rate <= 0:
+        return False
+    if rate >= 1:
+        return True
+    return random.random() < rate
+
+
+class RequestTimer:
+    """Small helper to time a request for sampled trace logging"""
+
+    def __init__(self):
+        self.start = time.perf_counter()
+
+    def elapsed_ms(self) -> float:
+        return (time.perf_counter() - self.start) * 1000
@@ -0,0 +1,79 @@
+import hashlib
+import os
+from pathlib import Path
+from typing import Optional
+
+from config import settings
+
+
+def media_root() -> Path:
+    """Get the media root directory, creating it if needed"""
+    root = Path(settings.MEDIA_ROOT)
+    root.mkdir(parents=True, exist_ok=True)
+    return root
+
+
+def media_file_path(kind: str, entity_id: int, filename: str, digest: str) -> Path:
+    """Build the on-disk path for an image (e.g. media/posts/3/cover.3fa2b1c9.jpg)"""
+    safe_name = Path(os.path.basename(filename or "image.jpg"))
+    return media_root() / kind / str(entity_id) / f"{safe_name.stem}.{digest}{safe_name.suffix}"
+
+
+def ensure_on_disk(kind: str, entity_id: int, filename: str, data: bytes) -> Path:
+    """
+    Write image bytes to the media directory if not already cached there.
+
+    The stored name embeds a content digest, so replacing an image - even
+    with different bytes of the same filename and length - lands on a new
+    path and the old cached file can never be served stale.
+
+    Returns the path so endpoints can serve the file with FileResponse
+    (os.sendfile on Linux) instead of pushing bytes through Python.
+    """
+    digest = hashlib.sha256(data).hexdigest()[:16]
+    path = media_file_path(kind, entity_id, filename, digest)
+    if not path.exists():
+        _write_atomic(path, data)
+    return path
+
+
+def _write_atomic(path: Path, data: bytes) -> None:
+    """Write bytes via a temp file so readers never see partial data"""
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp_path = path.with_suffix(path.suffix + ".tmp")
+    tmp_path.write_bytes(data)
+    os.replace(tmp_path, path)
+
+
+def blob_key(data: bytes, filename: str) -> str:
+    """Build a content-hash storage key for out-of-row image bytes"""
+    digest = hashlib.sha256(data).hexdigest()
+    ext = Path(filename or "").suffix.lower() or ".jpg"
+    return f"blobs/{digest[:2]}/{digest}{ext}"
+
+
+def blob_path(key: str) -> Path:
+    """Resolve a blob storage key to its on-disk path"""
+    return media_root() / key
+
+
+def store_blob(data: bytes, filename: str) -> str:
+    """
+    Store image bytes out-of-row in the media store, keyed by content hash.
+
+    Identical images share one file, so re-uploads are free. Returns the
+    storage key to persist on the row (blob_storage_key).
+    """
+    key = blob_key(data, filename)
+    path = blob_path(key)
+    if not path.exists():
+        _write_atomic(path, data)
+    return key
+
+
+def load_blob(key: str) -> Optional[bytes]:
+    """Load out-of-row image bytes by storage key (None if missing)"""
+    path = blob_path(key)
+    if not path.exists():
+        return None
+    return path.read_bytes()
@@ -1,42 +1,240 @@
-import qrcode
+import functools
 import io
-from PIL import Image
-from typing import Tuple
+import orjson
+import os
+import qrcode
+import qrcode.image.svg
+import struct
+import threading
+import zlib
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timezone
+from typing import List, Tuple
+
+_PNG_SIGNATURE = b"\x89PNG\r\n\x1a\n"
+
+# Typical device payloads (~120-190 bytes of compact JSON) fit QR version 8
+# at error level L (192-byte byte-mode capacity). Pinning the version skips
+# best_fit()'s scan over versions 1..40 on every generation; oversized
+# payloads fall back to the search.
+QR_PINNED_VERSION = 8
+
+# Fixed mask pattern. Any of the eight spec masks decodes fine; letting
+# qrcode pick the "best" one builds and penalty-scores all eight candidate
+# matrices per code, which is the bulk of make()'s pure-Python time once
+# the version is pinned. Pattern 2 behaves well on byte-mode JSON payloads.
+QR_MASK_PATTERN = 2
+
+# Per-thread reusable state: the default-shape QRCode instance and the
+# scanline/SVG working buffers
+_qr_local = threading.local()
+
+
+def _png_chunk(chunk_type: bytes, payload: bytes) -> bytes:
+    return (
+        struct.pack(">I", len(payload))
+        + chunk_type
+        + payload
+        + struct.pack(">I", zlib.crc32(chunk_type + payload))
+    )
+
+
+def _matrix_to_scanlines(matrix, box_size: int) -> Tuple[bytes, int]:
+    """Pack the boolean module matrix (border included) into 1-bit PNG
+    scanlines, filter byte included, one box_size x box_size block per
+    module.
+
+    Each matrix row is assembled as one big integer (box_size bits per
+    module, 0=black, 1=white per PNG grayscale), converted to bytes once
+    and repeated box_size times - an eighth of the buffer an 8-bit
+    grayscale expansion would feed to deflate, with no per-pixel loops.
+    """
+    width = len(matrix) * box_size
+    row_bytes = (width + 7) // 8
+    white_block = (1 << box_size) - 1
+    # Reuse a per-thread working buffer; the function returns an immutable
+    # bytes copy, so clearing it on the next call is safe
+    scanlines = getattr(_qr_local, "scanlines", None)
+    if scanlines is None:
+        scanlines = bytearray()
+        _qr_local.scanlines = scanlines
+    else:
+        scanlines.clear()
+    for row in matrix:
+        value = 0
+        for cell in row:
+            value = (value << box_size) | (0 if cell else white_block)
+        value <<= row_bytes * 8 - width  # pad the last byte
+        line = b"\x00" + value.to_bytes(row_bytes, "big")
+        scanlines += line * box_size
+    return bytes(scanlines), width
+
+
+def _encode_png_1bit(scanlines: bytes, width: int, height: int) -> bytes:
+    """Encode prebuilt 1-bit grayscale scanlines as PNG directly with zlib.
+
+    QR images are flat two-tone bitmaps; going through Pillow's generic
+    save machinery (mode dispatch, chunked encoder buffers) costs more than
+    the format itself. Scanlines use filter 0 and deflate level 1: most of
+    the data is long constant runs, so higher levels burn CPU for a few
+    bytes of savings on an image that travels over HTTP once.
+    """
+    ihdr = struct.pack(">IIBBBBB", width, height, 1, 0, 0, 0, 0)
+    return (
+        _PNG_SIGNATURE
+        + _png_chunk(b"IHDR", ihdr)
+        + _png_chunk(b"IDAT", zlib.compress(scanlines, 1))
+        + _png_chunk(b"IEND", b"")
+    )
+
+
+def _default_shape_qr() -> "qrcode.QRCode":
+    """Reusable per-thread QRCode for the default shape (box_size=10,
+    border=4), which is what create_device_qr_code always requests - skips
+    re-running __init__'s argument validation and attribute setup per call"""
+    qr = getattr(_qr_local, "qr", None)
+    if qr is None:
+        qr = qrcode.QRCode(
+            version=QR_PINNED_VERSION,
+            error_correction=qrcode.constants.ERROR_CORRECT_L,
+            box_size=10,
+            border=4,
+            mask_pattern=QR_MASK_PATTERN,
+        )
+        _qr_local.qr = qr
+    qr.clear()
+    # An earlier overflow fallback may have grown the version - re-pin it
+    qr.version = QR_PINNED_VERSION
+    return qr
+
+
+@functools.lru_cache(maxsize=256)
+def _generate_qr_png(data: str, size: int, border: int) -> bytes:
+    """Build the QR PNG bytes for (data, size, border) - cached, since the
+    matrix/mask/PNG work is identical for repeated payloads and bytes are
+    immutable so entries can be shared across requests"""
+    # Create QR code instance. The pinned qrcode release (>= 7.4) keeps a
+    # module-level cache of blank module grids (precomputed_qr_blanks in
+    # qrcode.main), so the finder/timing/alignment pattern setup runs once
+    # per version instead of on every make() - don't downgrade past that.
+    if size == 10 and border == 4:
+        qr = _default_shape_qr()
+    else:
+        qr = qrcode.QRCode(
+            version=QR_PINNED_VERSION,
+            error_correction=qrcode.constants.ERROR_CORRECT_L,
+            box_size=size,
+            border=border,
+            mask_pattern=QR_MASK_PATTERN,
+        )
+
+    # Add data and make QR code
+    qr.add_data(data)
+    try:
+        qr.make(fit=False)
+    except qrcode.exceptions.DataOverflowError:
+        # Payload larger than the pinned version - search for one that fits
+        qr.version = QR_PINNED_VERSION
+        qr.make(fit=True)
+
+    # Render the module matrix straight to packed scanlines and encode
+    scanlines, side = _matrix_to_scanlines(qr.get_matrix(), size)
+    return _encode_png_1bit(scanlines, side, side)
 
 
 def generate_qr_code(data: str, size: int = 10, border: int = 4) -> Tuple[bytes, str]:
     """
     Generate QR code image from data
-    
+
     Args:
         data: The data to encode in QR code
         size: Size of QR code (default 10)
         border: Border size (default 4)
-    
+
     Returns:
         Tuple of (image_bytes, content_type)
     """
-    # Create QR code instance
+    return _generate_qr_png(data, size, border), "image/png"
+
+
+def generate_qr_raw_bits(data: str) -> Tuple[bytes, int]:
+    """
+    Generate the raw 1-bit QR module matrix for service-to-service use
+
+    Args:
+        data: The data to encode in QR code
+
+    Returns:
+        Tuple of (packed_bits, side_length): modules row-major, packed 8
+        per byte MSB-first, no border and no image framing - (side*side)/8
+        bytes instead of a rasterized PNG, with no deflate cost at all.
+        Bit r*side + c is row r, column c.
+    """
+    qr = _default_shape_qr()  # box_size/border don't affect the matrix
+    qr.add_data(data)
+    try:
+        qr.make(fit=False)
+    except qrcode.exceptions.DataOverflowError:
+        qr.version = QR_PINNED_VERSION
+        qr.make(fit=True)
+
+    modules = qr.modules
+    side = len(modules)
+    bits = bytearray((side * side + 7) // 8)
+    index = 0
+    for row in modules:
+        for cell in row:
+            if cell:
+                bits[index >> 3] |= 0x80 >> (index & 7)
+            index += 1
+    return bytes(bits), side
+
+
+@functools.lru_cache(maxsize=256)
+def _generate_qr_svg(data: str, size: int, border: int) -> bytes:
+    """Build the QR SVG bytes for (data, size, border) - cached like the PNG path"""
     qr = qrcode.QRCode(
-        version=1,
+        version=QR_PINNED_VERSION,
         error_correction=qrcode.constants.ERROR_CORRECT_L,
         box_size=size,
         border=border,
+        mask_pattern=QR_MASK_PATTERN,
+        image_factory=qrcode.image.svg.SvgPathImage,
     )
-    
-    # Add data and make QR code
     qr.add_data(data)
-    qr.make(fit=True)
-    
-    # Create image
-    qr_image = qr.make_image(fill_color="black", back_color="white")
-    
-    # Convert to bytes
-    img_buffer = io.BytesIO()
-    qr_image.save(img_buffer, format='PNG')
-    img_buffer.seek(0)
-    
-    return img_buffer.getvalue(), "image/png"
+    try:
+        qr.make(fit=False)
+    except qrcode.exceptions.DataOverflowError:
+        qr.version = QR_PINNED_VERSION
+        qr.make(fit=True)
+
+    # Reuse a per-thread buffer; getvalue() hands back fresh immutable bytes
+    buf = getattr(_qr_local, "svg_buf", None)
+    if buf is None:
+        buf = io.BytesIO()
+        _qr_local.svg_buf = buf
+    buf.seek(0)
+    buf.truncate(0)
+    qr.make_image().save(buf)
+    return buf.getvalue()
+
+
+def generate_qr_code_svg(data: str, size: int = 10, border: int = 4) -> Tuple[bytes, str]:
+    """
+    Generate QR code as SVG from data
+
+    A few hundred bytes of path markup instead of a rasterized PNG - no
+    pixel expansion or deflate at all, and browsers scale it cleanly.
+
+    Args:
+        data: The data to encode in QR code
+        size: Size of QR code (default 10)
+        border: Border size (default 4)
+
+    Returns:
+        Tuple of (svg_bytes, content_type)
+    """
+    return _generate_qr_svg(data, size, border), "image/svg+xml"
 
 
 def generate_device_qr_data(device_id: int, device_name: str, version: str) -> str:
@@ -51,18 +249,17 @@ def generate_device_qr_data(device_id: int, device_name: str, version: str) -> s
     Returns:
         JSON string to be encoded in QR code
     """
-    import json
-    from datetime import datetime
-    
     qr_data = {
         "device_id": device_id,
         "device_name": device_name,
         "version": version,
         "type": "device",
-        "generated_at": str(datetime.utcnow().isoformat())
+        "generated_at": datetime.now(timezone.utc).isoformat()
     }
-    
-    return json.dumps(qr_data)
+
+    # orjson output is already compact: fewer payload bytes means fewer
+    # QR modules, and the C serializer beats stdlib json on this hot path
+    return orjson.dumps(qr_data).decode('utf-8')
 
 
 def create_device_qr_code(device_id: int, device_name: str, version: str) -> Tuple[bytes, str, str]:
@@ -77,13 +274,33 @@ def create_device_qr_code(device_id: int, device_name: str, version: str) -> Tup
     Returns:
         Tuple of (qr_image_bytes, content_type, qr_data_string)
     """
-    from datetime import datetime
-    import json
-    
     # Generate QR data
     qr_data = generate_device_qr_data(device_id, device_name, version)
     
     # Generate QR code image
     qr_image_bytes, content_type = generate_qr_code(qr_data)
-    
+
     return qr_image_bytes, content_type, qr_data
+
+
+def create_device_qr_codes(devices: List[Tuple[int, str, str]]) -> List[Tuple[bytes, str, str]]:
+    """
+    Create QR codes for many devices in parallel
+
+    Args:
+        devices: List of (device_id, device_name, version) tuples
+
+    Returns:
+        List of (qr_image_bytes, content_type, qr_data_string), same order
+
+    Per-device generation is CPU-bound and independent, and the deflate
+    step releases the GIL, so a thread pool scales with cores instead of
+    generating one code at a time.
+    """
+    if not devices:
+        return []
+    if len(devices) == 1:
+        return [create_device_qr_code(*devices[0])]
+    workers = min(len(devices), os.cpu_count() or 1)
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        return list(pool.map(lambda args: create_device_qr_code(*args), devices))